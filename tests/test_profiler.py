@@ -0,0 +1,175 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+
+import cProfile
+import os
+import shutil
+import sys
+
+import pytest
+
+from ultralytics_profile.profiler import Profiler
+
+
+def make_raw_stats():
+    """Builds a raw cProfile stats dict by profiling a trivial workload."""
+    profile = cProfile.Profile()
+    profile.enable()
+    sum(i * i for i in range(1000))
+    profile.disable()
+    profile.create_stats()
+    return profile.stats
+
+
+def test_method_validation():
+    """Tests that the Profiler rejects unknown profiling methods."""
+    assert Profiler(method="tracing").method == "tracing"
+    assert Profiler().method == "sampling"
+    with pytest.raises(ValueError, match="sampling"):
+        Profiler(method="magic")
+
+
+def test_is_python_command():
+    """Tests Python command detection for interpreters, scripts, and shell commands."""
+    profiler = Profiler()
+    assert profiler._is_python_command(["python", "train.py"])
+    assert profiler._is_python_command(["python3", "-c", "pass"])
+    assert profiler._is_python_command(["train.py", "--epochs", "1"])
+    assert not profiler._is_python_command(["definitely-not-a-real-command-12345"])
+
+
+def test_main_usage(capsys, monkeypatch):
+    """Tests that incomplete CLI invocations print usage instead of crashing."""
+    from ultralytics_profile.profiler import main
+
+    for argv in (["prog"], ["prog", "--method", "tracing"], ["prog", "--flamegraph", "--method"]):
+        monkeypatch.setattr(sys, "argv", argv)
+        main()
+        assert "Usage:" in capsys.readouterr().out
+    with pytest.raises(ValueError, match="no command"):
+        Profiler().profile("")
+
+
+def test_extract_timing_data():
+    """Tests that pstats data is converted into the timings dict with package classification."""
+    profiler = Profiler(method="tracing")
+    profiler._extract_timing_data(make_raw_stats())
+    assert profiler.timings
+    for info in profiler.timings.values():
+        assert info["cumtime"] >= info["tottime"] >= 0.0
+        assert info["is_ultralytics"] == (info["package"] == "ultralytics")
+        assert "/" not in info["file"]  # basenames only
+
+
+def test_profile_python_command_tracing(tmp_path):
+    """Tests end-to-end tracing of a Python script, including streamed output capture."""
+    script = tmp_path / "target.py"
+    script.write_text("print(6 * 7)\n")
+    profiler = Profiler(method="tracing")
+    assert profiler.profile(f"python {script}") is profiler
+    assert "42" in profiler.output
+    assert not profiler._timings  # profiling alone must not materialize the dict
+    assert profiler.timings  # first attribute access builds it from the raw stats
+
+
+def test_profile_failing_command(tmp_path):
+    """Tests that a target failing before cProfile dumps its stats raises instead of returning empty timings."""
+    profiler = Profiler(method="tracing")
+    with pytest.raises(RuntimeError, match="before writing stats"):
+        profiler.profile(f"python {tmp_path / 'does_not_exist.py'}")
+    assert "does_not_exist" in profiler.output  # the child's own error is preserved for diagnosis
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="shebang scripts cannot execute on Windows")
+def test_profile_console_script(tmp_path, monkeypatch):
+    """Tests that a shebang console script on PATH is resolved and profiled, not looked up in the cwd."""
+    script = tmp_path / "fake-entry-point"
+    script.write_text("#!/usr/bin/env python\nprint('entry point ran')\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    profiler = Profiler(method="tracing")
+    profiler.profile("fake-entry-point")
+    assert "entry point ran" in profiler.output
+    assert profiler.timings
+
+
+@pytest.mark.skipif(
+    sys.version_info >= (3, 15) or shutil.which("py-spy") is None, reason="sampling on <3.15 needs py-spy"
+)
+def test_profile_python_command_sampling(tmp_path):
+    """Tests end-to-end sampling where py-spy spawns the target itself, needing no ptrace attach."""
+    script = tmp_path / "busy.py"
+    script.write_text("import math\nx = 0\nfor i in range(1, 3_000_000):\n    x += math.sqrt(i)\nprint(int(x))\n")
+    profiler = Profiler()
+    profiler.profile(f"python {script}")
+    assert profiler.timings
+    assert any("busy.py" in key for key in profiler.timings)
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 15), reason="3.15+ samples with the stdlib, no py-spy involved")
+def test_sampling_without_pyspy(monkeypatch):
+    """Tests that a missing py-spy binary surfaces as a clear error instead of FileNotFoundError."""
+    monkeypatch.setenv("PATH", "")
+    profiler = Profiler(method="sampling")
+    with pytest.raises(RuntimeError, match="py-spy"):
+        profiler.profile(["python", "-c", "import time; time.sleep(10)"])
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="echo is a cmd builtin on Windows, not an executable")
+def test_profile_bash_command():
+    """Tests wall-clock profiling of a non-Python command."""
+    profiler = Profiler()
+    timings = profiler.profile('echo "hello world"').timings
+    assert "hello world" in profiler.output  # quoted argument survives shlex tokenization
+    assert "echo" in timings
+    assert timings["echo"]["cumtime"] >= 0.0
+    if "user_time" in timings["echo"]:  # rusage fields are POSIX-only
+        assert timings["echo"]["user_time"] >= 0.0
+        assert timings["echo"]["max_rss_mb"] > 0.0
+
+
+def test_flamegraph_output(tmp_path):
+    """Tests that collapsed stacks are written in folded format from a tracing profile."""
+    profiler = Profiler(method="tracing")
+    profiler._extract_timing_data(make_raw_stats())
+    out = tmp_path / "profile.folded"
+    profiler.analyze_performance(format="flamegraph", output_file=out)
+    lines = out.read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, _, count = line.rpartition(" ")
+        assert stack and int(count) >= 0
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self"), reason="process-tree watching needs /proc")
+def test_watch_process_tree():
+    """Tests that the live monitor records peak CPU/RSS for a target process and that the summary reports it."""
+    import subprocess
+    import threading
+
+    profiler = Profiler()
+    target = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(1)"])
+    stop = threading.Event()
+    watcher = threading.Thread(target=profiler._watch_process_tree, args=(target.pid, stop, 0.05))
+    watcher.start()
+    try:
+        while target.poll() is None and profiler.live_stats.get("processes", 0) == 0:
+            stop.wait(0.05)
+    finally:
+        stop.set()
+        watcher.join(timeout=2)
+        target.kill()
+        target.wait()
+    assert profiler.live_stats["processes"] >= 1
+    assert profiler.live_stats["max_rss_mb"] > 0.0
+    assert profiler.live_stats["cpu_time"] >= 0.0
+
+
+def test_analyze_performance(capsys):
+    """Tests that analyze_performance prints the expected rankings."""
+    profiler = Profiler(method="tracing", top_n=5)
+    profiler._extract_timing_data(make_raw_stats())
+    profiler.analyze_performance()
+    captured = capsys.readouterr().out
+    assert "cumulative time" in captured
+    assert "self time" in captured
+    assert "Self time by package" in captured
@@ -0,0 +1,5 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+
+from ultralytics_profile.profiler import Profiler, profile_command
+
+__all__ = ["Profiler", "profile_command"]
@@ -0,0 +1,735 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+
+import heapq
+import io
+import json
+import marshal
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
+
+SKIP_PATTERNS = ("<frozen", "<built-in", "<string>", "importlib", "_bootstrap")
+
+# One alternation regex scans each string once instead of len(SKIP_PATTERNS) substring probes per row
+_SKIP_RE = re.compile("|".join(map(re.escape, SKIP_PATTERNS)))
+
+_PKG_RE = re.compile(r"[/\\](ultralytics|torch|numpy|cv2|PIL|torchvision)[/\\]")
+
+# Precompiled table formats: binding .format_map once avoids re-parsing the format spec on every row
+_TABLE_HEADER = f"{'Function':<60} {'Calls':>10} {'Total':>10} {'Cumulative':>12}\n"
+_TABLE_ROW = "{key:<60} {calls:>10} {tot:>10.4f} {cum:>12.4f}\n".format_map
+_PACKAGE_ROW = "{package:<20} {total:>10.4f}s\n".format_map
+
+
+@lru_cache(maxsize=4096)
+def _classify(filename):
+    """Returns the package a source filename belongs to, or None for unclassified files.
+
+    Filenames repeat across thousands of pstats rows, so results are memoized; a single compiled regex search replaces
+    the per-row cascade of substring scans over the full path.
+
+    Args:
+        filename (str): Source file path from a profile row.
+
+    Returns:
+        (str | None): Matched package name, e.g. "ultralytics" or "torch".
+
+    Examples:
+        >>> _classify("/opt/venv/site-packages/torch/nn/functional.py")
+        'torch'
+        >>> _classify("train.py") is None
+        True
+    """
+    m = _PKG_RE.search(filename)
+    return m.group(1) if m else None
+
+
+class Profiler:
+    """Profiles Python and shell commands and reports where time is spent.
+
+    Python targets are profiled with one of two methods. The default "sampling" method launches the command unmodified
+    and attaches a statistical sampler to its PID (the stdlib `profiling.sampling` module on Python 3.15+, `py-spy`
+    otherwise), which adds virtually no overhead and correctly attributes time spent inside native extensions such as
+    torch or cuDNN. The "tracing" method runs the command under deterministic `cProfile` instead, which records exact
+    call counts at the cost of slowing down every Python call. Non-Python commands fall back to wall-clock timing.
+
+    Attributes:
+        method (str): Profiling method for Python targets, either "sampling" or "tracing".
+        top_n (int): Number of functions to show in each ranking printed by analyze_performance.
+        timings (dict): Per-function timing data populated by profile, keyed by a human-readable function label.
+        output (str): Combined stdout/stderr captured from the profiled command.
+        duration (float): Total wall-clock duration of the last profiled command in seconds.
+        live_stats (dict): Peak aggregate CPU time, RSS, and process count across the sampled target's process tree
+            (including forked workers), gathered live during sampling runs on platforms with /proc.
+
+    Examples:
+        >>> profiler = Profiler(method="tracing", top_n=10)
+        >>> profiler.method
+        'tracing'
+    """
+
+    def __init__(self, method="sampling", top_n=20):
+        """Initializes a Profiler with the given profiling method and ranking size.
+
+        Args:
+            method (str): Profiling method for Python targets, either "sampling" (statistical, low overhead) or
+                "tracing" (deterministic cProfile with exact call counts).
+            top_n (int): Number of functions to show in each ranking printed by analyze_performance.
+        """
+        if method not in {"sampling", "tracing"}:
+            raise ValueError(f"method must be 'sampling' or 'tracing', got {method!r}")
+        self.method = method
+        self.top_n = top_n
+        self._timings = {}
+        self.output = ""
+        self.duration = 0.0
+        self._raw_stats = None  # raw cProfile dict kept for flamegraph stack reconstruction
+        self._folded = None  # collapsed stacks from sampling, keyed "frame;frame;frame" -> seconds
+        self.live_stats = {}  # peak process-tree CPU/RSS gathered while a sampled target runs (Linux only)
+
+    @property
+    def timings(self):
+        """Per-function timing data keyed by function label, materialized lazily from the raw stats on first access."""
+        if not self._timings and self._raw_stats is not None:
+            self._timings = dict(self._iter_timing_rows(self._raw_stats))
+        return self._timings
+
+    @timings.setter
+    def timings(self, value):
+        self._timings = value
+
+    def profile(self, command):
+        """Profiles a command, dispatching to the Python or shell path based on what the command runs.
+
+        Args:
+            command (str | list[str]): Command to profile, e.g. "yolo predict model=yolo11n.pt" or an argument list.
+                Strings are tokenized once with shlex, so quoted arguments survive intact; on Windows the
+                non-posix mode keeps backslashes in paths like C:\\Temp\\t.py from being eaten as escapes.
+
+        Returns:
+            (Profiler): This profiler with output and duration populated. Accessing timings materializes the
+                per-function dict; analyze_performance streams the rows instead and never forces it.
+        """
+        args = shlex.split(command, posix=os.name == "posix") if isinstance(command, str) else list(command)
+        if not args:
+            raise ValueError("no command to profile")
+        start = time.time()
+        if self._is_python_command(args):
+            self._profile_python_command(args)
+        else:
+            self._profile_bash_command(args)
+        self.duration = time.time() - start
+        return self
+
+    def _is_python_command(self, args):
+        """Determines whether a command runs Python, checking the executable name, extension, and shebang line.
+
+        Args:
+            args (list[str]): Tokenized command to inspect.
+
+        Returns:
+            (bool): True if the command runs a Python interpreter or script.
+        """
+        executable = args[0]
+        if executable.rpartition("/")[2].startswith("python") or executable.endswith(".py"):
+            return True
+        path = shutil.which(executable)
+        if not path:
+            return False
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                head = os.read(fd, 256)  # shebang lines fit well within one small binary read
+            finally:
+                os.close(fd)
+        except OSError:
+            return False
+        return head.startswith(b"#!") and b"python" in head.split(b"\n", 1)[0]
+
+    def _profile_python_command(self, args):
+        """Profiles a Python command with the configured method and populates self.timings.
+
+        Args:
+            args (list[str]): Tokenized Python command to profile.
+        """
+        if Path(args[0]).name.startswith("python"):
+            args = args[1:]
+        elif not os.path.isfile(args[0]):
+            resolved = shutil.which(args[0])  # console scripts like yolo live on PATH, not in the cwd
+            if resolved:
+                args = [resolved, *args[1:]]
+        if self.method == "tracing":
+            self._trace_python_command(args)
+        else:
+            self._sample_python_command(args)
+
+    def _trace_python_command(self, args):
+        """Runs a Python target under deterministic cProfile and extracts its timing data.
+
+        Args:
+            args (list[str]): Target argument list with any leading interpreter stripped.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".pstats", delete=False) as f:
+            stats_file = f.name
+        try:
+            cmd = [sys.executable, "-m", "cProfile", "-o", stats_file, *args]
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+            lines, threads = self._drain_output(process)
+            parsed = {}
+            on_exit = lambda: parsed.update(self._load_raw_stats(stats_file))  # noqa: E731
+            try:
+                self._wait_and_join(process, lines, threads, on_exit=on_exit)
+            except EOFError:  # cProfile only dumps stats on clean exit, so a failed child leaves the file empty
+                raise RuntimeError(
+                    f"profiled command exited with code {process.returncode} before writing stats:\n{self.output}"
+                ) from None
+            self._raw_stats = parsed  # timings materialize lazily; analyze_performance streams the rows directly
+        finally:
+            os.unlink(stats_file)
+
+    def _sample_python_command(self, args):
+        """Runs a Python target at full speed under a statistical sampler.
+
+        On Python 3.15+ the target is launched directly and the stdlib `profiling.sampling` module attaches to its
+        PID. On earlier versions `py-spy record` spawns the target itself and samples its own child, which needs no
+        ptrace attach permission (Yama ptrace_scope forbids attaching to non-child siblings on stock Linux). Either
+        way the target runs unmodified, so torch/cuDNN and other native time is attributed correctly instead of being
+        hidden behind tracing overhead.
+
+        Args:
+            args (list[str]): Target argument list with any leading interpreter stripped.
+        """
+        use_stdlib = sys.version_info >= (3, 15)
+        with tempfile.NamedTemporaryFile(suffix=".pstats" if use_stdlib else ".json", delete=False) as f:
+            stats_file = f.name
+        if use_stdlib:
+            cmd = [sys.executable, *args]
+        else:
+            cmd = ["py-spy", "record", "-o", stats_file, "--format", "speedscope", "--", sys.executable, *args]
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        except FileNotFoundError:
+            os.unlink(stats_file)
+            raise RuntimeError(
+                "sampling requires py-spy on Python < 3.15; pip install py-spy or use method='tracing'"
+            ) from None
+        lines, threads = self._drain_output(process)
+        stop = threading.Event()
+        monitor = threading.Thread(target=self._watch_process_tree, args=(process.pid, stop), daemon=True)
+        monitor.start()
+        try:
+            if use_stdlib:
+                pid = str(process.pid)
+                sampler = [sys.executable, "-m", "profiling.sampling", "-p", pid, "--mode", "wall", "-o", stats_file]
+                result = subprocess.run(sampler, capture_output=True, text=True, timeout=300)
+                self._wait_and_join(process, lines, threads)
+                if result.returncode != 0:
+                    detail = result.stderr.strip() or result.stdout.strip()
+                    raise RuntimeError(f"sampler exited with code {result.returncode}: {detail}")
+                self._raw_stats = self._load_raw_stats(stats_file)
+            else:
+                self._wait_and_join(process, lines, threads)  # target output arrives through py-spy's inherited pipes
+                if process.returncode != 0:
+                    raise RuntimeError(f"py-spy exited with code {process.returncode}:\n{self.output}")
+                self._extract_speedscope_data(stats_file)
+        finally:
+            stop.set()
+            monitor.join(timeout=2)
+            if process.poll() is None:
+                process.kill()
+            os.unlink(stats_file)
+
+    def _profile_bash_command(self, args):
+        """Profiles a non-Python command with wall-clock timing plus child user/sys CPU time and peak RSS.
+
+        CPU and memory figures come from resource.getrusage(RUSAGE_CHILDREN) deltas around the run, which the kernel
+        accounts for free when the child is reaped; wall time alone hides whether a command was CPU-bound or waiting.
+
+        Args:
+            args (list[str]): Tokenized shell command to profile.
+        """
+        before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+        start = time.time()
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        lines, threads = self._drain_output(process)
+        self._wait_and_join(process, lines, threads)
+        elapsed = time.time() - start
+        name = Path(args[0]).name
+        entry = {
+            "function": name,
+            "file": name,
+            "ncalls": 1,
+            "tottime": elapsed,
+            "cumtime": elapsed,
+            "package": None,
+            "is_ultralytics": False,
+        }
+        if before is not None:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            entry["user_time"] = after.ru_utime - before.ru_utime
+            entry["sys_time"] = after.ru_stime - before.ru_stime
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            entry["max_rss_mb"] = after.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+        self.timings = {name: entry}
+
+    @staticmethod
+    def _drain_output(process):
+        """Starts reader threads that drain a process's stdout and stderr into a size-capped deque.
+
+        Buffering a verbose target's entire output in one string pins O(all-output) memory and stalls on a single
+        decode; draining line by line into a deque keeps peak memory at the last 10k lines.
+
+        Args:
+            process (subprocess.Popen): Process opened with piped, text-mode stdout and stderr.
+
+        Returns:
+            (collections.deque): Size-capped deque receiving output lines.
+            (list[threading.Thread]): Started reader threads, one per stream.
+        """
+        lines = deque(maxlen=10_000)
+
+        def reader(stream):
+            with stream:
+                for line in stream:
+                    lines.append(line.rstrip("\n"))
+
+        threads = [threading.Thread(target=reader, args=(s,), daemon=True) for s in (process.stdout, process.stderr)]
+        for thread in threads:
+            thread.start()
+        return lines, threads
+
+    def _wait_and_join(self, process, lines, threads, timeout=300, on_exit=None):
+        """Waits for a drained process to exit, joins its reader threads, and stores the captured output.
+
+        Args:
+            process (subprocess.Popen): Process being drained by _drain_output.
+            lines (collections.deque): Deque the reader threads append to.
+            threads (list[threading.Thread]): Reader threads returned by _drain_output.
+            timeout (int): Seconds to wait for the process before killing it.
+            on_exit (callable | None): Work to run in a worker thread the instant the process exits, overlapping it
+                with reader-thread teardown and output assembly, e.g. parsing the stats file the child just wrote.
+        """
+        worker = None
+        errors = []
+
+        def run_on_exit():
+            try:
+                on_exit()
+            except Exception as e:  # re-raised below so worker failures are not swallowed by the thread
+                errors.append(e)
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        else:
+            if on_exit is not None:
+                worker = threading.Thread(target=run_on_exit, daemon=True)
+                worker.start()
+        finally:
+            for thread in threads:
+                thread.join(timeout=10)
+            self.output = "\n".join(lines)
+        if worker is not None:
+            worker.join()
+            if errors:
+                raise errors[0]
+
+    @staticmethod
+    def _parse_stat_buffer(buf):
+        """Parses utime, stime, and RSS pages from a raw /proc/<pid>/stat buffer without decoding to str.
+
+        Args:
+            buf (bytes): Contents of a /proc/<pid>/stat file.
+
+        Returns:
+            (tuple[int, int, int]): CPU user ticks, CPU system ticks, and resident set size in pages.
+
+        Examples:
+            >>> Profiler._parse_stat_buffer(b"7 (a b) S " + b" ".join(b"%d" % i for i in range(4, 30)))
+            (14, 15, 24)
+        """
+        tail = buf[buf.rfind(b")") + 2 :].split(b" ")  # skip past comm, which may itself contain spaces
+        return int(tail[11]), int(tail[12]), int(tail[21])  # stat fields 14 (utime), 15 (stime), 24 (rss)
+
+    def _watch_process_tree(self, pid, stop, interval=0.5):
+        """Polls /proc for the target and its children, recording peak aggregate CPU time, RSS, and process count.
+
+        Forked dataloader workers do real work that per-process rusage misses, so the whole tree is read each cycle.
+        File descriptors are cached across cycles and re-read with os.pread, one syscall per live process, and the
+        buffers are parsed as bytes without any string decode. Does nothing on platforms without /proc.
+
+        Args:
+            pid (int): Root PID of the profiled target.
+            stop (threading.Event): Event that ends the polling loop.
+            interval (float): Seconds between polling cycles.
+        """
+        root = Path(f"/proc/{pid}")
+        if not root.exists():
+            return
+        ticks = os.sysconf("SC_CLK_TCK")
+        page_mb = os.sysconf("SC_PAGESIZE") / (1 << 20)
+        fds = {}
+        peak = {"processes": 0, "cpu_time": 0.0, "max_rss_mb": 0.0}
+        try:
+            while not stop.wait(interval):
+                # Walk the whole tree so grandchildren (e.g. workers forked by a spawned trainer) are counted too
+                pids, queue = [pid], [pid]
+                while queue:
+                    parent = queue.pop()
+                    try:
+                        children = Path(f"/proc/{parent}/task/{parent}/children").read_bytes().split()
+                    except OSError:
+                        continue
+                    for child in map(int, children):
+                        if child not in pids:
+                            pids.append(child)
+                            queue.append(child)
+                cpu = rss = 0
+                alive = 0
+                for p in pids:
+                    fd = fds.get(p)
+                    try:
+                        if fd is None:
+                            fd = fds[p] = os.open(f"/proc/{p}/stat", os.O_RDONLY)
+                        utime, stime, pages = self._parse_stat_buffer(os.pread(fd, 512, 0))
+                    except OSError:  # process exited, drop its cached fd
+                        if fds.pop(p, None) is not None and fd is not None:
+                            os.close(fd)
+                        continue
+                    alive += 1
+                    cpu += utime + stime
+                    rss += pages
+                peak["processes"] = max(peak["processes"], alive)
+                peak["cpu_time"] = max(peak["cpu_time"], cpu / ticks)
+                peak["max_rss_mb"] = max(peak["max_rss_mb"], rss * page_mb)
+                self.live_stats = peak  # refreshed every cycle so callers can watch it during the run
+        finally:
+            for fd in fds.values():
+                os.close(fd)
+
+    @staticmethod
+    def _load_raw_stats(stats_file):
+        """Loads a cProfile stats dump directly with marshal, skipping the pstats.Stats wrapper and its dict copy.
+
+        Args:
+            stats_file (str): Path to a stats file written by cProfile.
+
+        Returns:
+            (dict): Raw mapping of (filename, line, function) tuples to (cc, nc, tt, ct, callers) entries.
+        """
+        with open(stats_file, "rb") as f:
+            return marshal.load(f)
+
+    def _extract_timing_data(self, raw_stats):
+        """Materializes the per-function timings dict from a raw cProfile stats dict.
+
+        Kept as the eager API for callers that want the full dict up front; analyze_performance streams the rows
+        through _iter_timing_rows instead and never builds the dict for the display path.
+
+        Args:
+            raw_stats (dict): Mapping of (filename, line, function) tuples to (cc, nc, tt, ct, callers) entries, as
+                produced by cProfile and loaded by _load_raw_stats.
+        """
+        self._raw_stats = raw_stats
+        self._timings = dict(self._iter_timing_rows(raw_stats))
+
+    @staticmethod
+    def _iter_timing_rows(raw_stats):
+        """Yields (key, info) timing rows from a raw cProfile stats dict, classifying functions by package.
+
+        Args:
+            raw_stats (dict): Mapping of (filename, line, function) tuples to (cc, nc, tt, ct, callers) entries.
+
+        Yields:
+            (tuple[str, dict]): Function label and its timing info dict.
+        """
+        skip = _SKIP_RE.search  # local binding avoids a global lookup per row
+        for func_info, (cc, nc, tt, ct, callers) in raw_stats.items():
+            filename, line, func_name = func_info
+            if skip(filename) or skip(func_name):
+                continue
+            name = filename.rpartition("/")[2]
+            package = _classify(filename)
+            key = f"{package}/{name}:{func_name}" if package else f"{name}:{func_name}"
+            yield key, {
+                "function": func_name,
+                "file": name,
+                "module": name.rsplit(".", 1)[0],
+                "line": line,
+                "ncalls": nc,
+                "tottime": tt,
+                "cumtime": ct,
+                "package": package,
+                "is_ultralytics": package == "ultralytics",
+            }
+
+    def _extract_speedscope_data(self, stats_file):
+        """Converts a py-spy speedscope JSON recording into the same timings dict schema as the pstats path.
+
+        Args:
+            stats_file (str): Path to the speedscope-format JSON file written by py-spy.
+        """
+        with open(stats_file) as f:
+            data = json.load(f)
+        frames = data["shared"]["frames"]
+        timings = {}
+        folded = {}
+        for profile in data["profiles"]:
+            scale = 1e-9 if profile.get("unit") == "nanoseconds" else 1.0
+            for sample, weight in zip(profile["samples"], profile["weights"]):
+                weight *= scale
+                labels = []
+                for depth, frame_index in enumerate(sample):
+                    frame = frames[frame_index]
+                    filename = frame.get("file", "")
+                    if _SKIP_RE.search(filename) or _SKIP_RE.search(frame["name"]):
+                        continue
+                    name = filename.rpartition("/")[2]
+                    package = _classify(filename)
+                    key = f"{package}/{name}:{frame['name']}" if package else f"{name}:{frame['name']}"
+                    entry = timings.setdefault(
+                        key,
+                        {
+                            "function": frame["name"],
+                            "file": name,
+                            "module": name.rsplit(".", 1)[0],
+                            "line": frame.get("line", 0),
+                            "ncalls": 0,
+                            "tottime": 0.0,
+                            "cumtime": 0.0,
+                            "package": package,
+                            "is_ultralytics": package == "ultralytics",
+                        },
+                    )
+                    entry["cumtime"] += weight
+                    labels.append(key)
+                    if depth == len(sample) - 1:  # leaf frame owns the sample's self time
+                        entry["tottime"] += weight
+                        entry["ncalls"] += 1
+                if labels:
+                    stack = ";".join(labels)
+                    folded[stack] = folded.get(stack, 0.0) + weight
+        self.timings = timings
+        self._folded = folded
+
+    def _folded_stacks(self):
+        """Returns collapsed call stacks as a mapping of "frame;frame;frame" strings to self time in seconds.
+
+        Sampling profiles keep their true stacks from the recording. Tracing profiles only record caller edges, so each
+        function's stack is approximated by walking its heaviest caller chain, the standard pstats-to-flamegraph
+        reduction.
+
+        Returns:
+            (dict): Collapsed stack lines mapped to seconds of self time.
+        """
+        if self._folded is not None:
+            return self._folded
+        folded = {}
+        raw = self._raw_stats or {}
+        for func_info, (cc, nc, tt, ct, callers) in raw.items():
+            if tt <= 0.0:
+                continue
+            filename = func_info[0]
+            if _SKIP_RE.search(filename) or _SKIP_RE.search(func_info[2]):
+                continue
+            stack = [f"{filename.rpartition('/')[2]}:{func_info[2]}"]
+            seen = {func_info}
+            node = func_info
+            while True:
+                entry = raw.get(node)
+                parents = entry[4] if entry else {}
+                if not parents:
+                    break
+                node = max(parents.items(), key=lambda item: item[1][3])[0]  # heaviest caller by cumulative time
+                if node in seen:
+                    break
+                seen.add(node)
+                stack.append(f"{node[0].rpartition('/')[2]}:{node[2]}")
+            line = ";".join(reversed(stack))
+            folded[line] = folded.get(line, 0.0) + tt
+        return folded
+
+    def write_flamegraph(self, output_file="profile.folded"):
+        """Writes the profile as collapsed stacks for flamegraph.pl, speedscope, or the Firefox Profiler.
+
+        Args:
+            output_file (str | Path): Destination for the folded-stack file, one "frame;frame count" line per stack
+                with counts in microseconds.
+
+        Returns:
+            (Path): Path to the written file.
+        """
+        output_file = Path(output_file)
+        lines = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in self._folded_stacks().items()]
+        output_file.write_text("\n".join(lines) + "\n")
+        return output_file
+
+    def analyze_performance(self, format="tables", output_file="profile.folded"):
+        """Summarizes the profiled run, either as ranked text tables or as a flamegraph input file.
+
+        The default "tables" format prints rankings by cumulative time, self time, and Ultralytics-only time plus a
+        per-package summary. The "flamegraph" format instead writes collapsed stacks in one pass for rendering in
+        flamegraph.pl or the Firefox Profiler, which shows the call tree directly.
+
+        Args:
+            format (str): Output format, either "tables" or "flamegraph".
+            output_file (str | Path): Destination for the folded-stack file when format="flamegraph".
+        """
+        if not self._timings and self._raw_stats is None:
+            print("No timing data collected, run profile() first")
+            return
+        if format == "flamegraph":
+            path = self.write_flamegraph(output_file)
+            print(f"Flamegraph stacks written to {path}, render with flamegraph.pl or https://profiler.firefox.com")
+            return
+        buffer = io.StringIO()
+        write = buffer.write
+
+        # One pass over the rows feeds all three rankings through bounded min-heaps of size top_n (the unique index
+        # breaks score ties so the info dicts are never compared) and collects the package aggregation inputs. Rows
+        # stream straight from the raw stats when the timings dict was never materialized, keeping the display path at
+        # O(top_n) row dicts instead of O(N).
+        top_n = self.top_n
+        by_cum, by_tot, by_ultra = [], [], []
+        labels, tots = [], []
+        rows = self._timings.items() if self._timings else self._iter_timing_rows(self._raw_stats)
+        for index, item in enumerate(rows):
+            info = item[1]
+            self._heap_push(by_cum, (info["cumtime"], index, item), top_n)
+            self._heap_push(by_tot, (info["tottime"], index, item), top_n)
+            if info["is_ultralytics"]:
+                self._heap_push(by_ultra, (info["cumtime"], index, item), top_n)
+            labels.append(info["package"] or "other")
+            tots.append(info["tottime"])
+
+        self._write_table(write, f"Top {top_n} functions by cumulative time:", self._heap_items(by_cum))
+        self._write_table(write, f"Top {top_n} functions by self time:", self._heap_items(by_tot))
+        if by_ultra:
+            title = f"Top {top_n} Ultralytics functions by cumulative time:"
+            self._write_table(write, title, self._heap_items(by_ultra))
+
+        # Vectorized aggregation: factorize package labels to integer codes and bincount the self times
+        names, codes = np.unique(labels, return_inverse=True)
+        totals = np.bincount(codes, weights=np.asarray(tots, dtype=np.float64))
+        write("\nSelf time by package:\n")
+        for i in np.argsort(totals)[::-1]:
+            write(_PACKAGE_ROW({"package": names[i], "total": totals[i]}))
+
+        if self.live_stats.get("processes"):
+            write(
+                f"\nPeak process tree: {self.live_stats['processes']} processes, "
+                f"{self.live_stats['cpu_time']:.2f}s CPU, {self.live_stats['max_rss_mb']:.1f} MB RSS\n"
+            )
+
+        sys.stdout.write(buffer.getvalue())  # one flush so piped output never interleaves
+
+    @staticmethod
+    def _heap_push(heap, entry, top_n):
+        """Pushes an entry into a min-heap bounded at top_n elements, evicting the smallest when full.
+
+        Args:
+            heap (list): Heap maintained by the heapq module.
+            entry (tuple): (score, index, item) entry; the index keeps comparisons from reaching the item.
+            top_n (int): Maximum heap size.
+        """
+        if len(heap) < top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    @staticmethod
+    def _heap_items(heap):
+        """Returns a bounded heap's (key, info) items in descending score order.
+
+        Args:
+            heap (list): Heap of (score, index, item) entries built by _heap_push.
+
+        Returns:
+            (list[tuple[str, dict]]): Ranked items, largest score first.
+        """
+        return [entry[2] for entry in sorted(heap, reverse=True)]
+
+    @staticmethod
+    def _write_table(write, title, rows):
+        """Writes one ranked table into the output buffer using the precompiled row format.
+
+        Args:
+            write (callable): Bound write method of the output buffer.
+            title (str): Table title line.
+            rows (list[tuple[str, dict]]): Ranked (key, info) pairs to print.
+        """
+        write(f"\n{title}\n")
+        write(_TABLE_HEADER)
+        for key, info in rows:
+            row = {"key": key[:60], "calls": info["ncalls"], "tot": info["tottime"], "cum": info["cumtime"]}
+            write(_TABLE_ROW(row))
+
+
+def profile_command(command, method="sampling", top_n=20):
+    """Profiles a command and returns the Profiler with its timing data populated.
+
+    Canonical single-call entry point so library users import one thing from one module instead of wiring up the class
+    themselves.
+
+    Args:
+        command (str | list[str]): Command to profile, as a string or an already-tokenized argument list.
+        method (str): Profiling method for Python targets, either "sampling" or "tracing".
+        top_n (int): Number of functions to show in each ranking printed by analyze_performance.
+
+    Returns:
+        (Profiler): Profiler instance with timings, output, and duration populated.
+
+    Examples:
+        >>> profiler = profile_command("echo hello")
+        >>> "echo" in profiler.timings
+        True
+    """
+    profiler = Profiler(method=method, top_n=top_n)
+    profiler.profile(command)
+    return profiler
+
+
+def main():
+    """CLI entry point that profiles the command given on the command line and prints its performance summary."""
+    usage = "Usage: ultralytics-profile [--method sampling|tracing] [--flamegraph] <command...>"
+    args = sys.argv[1:]
+    method = "sampling"
+    format = "tables"
+    while args and args[0] in {"--method", "--flamegraph"}:  # flags are accepted in either order
+        if args[0] == "--flamegraph":
+            format = "flamegraph"
+            args = args[1:]
+        elif len(args) < 2:
+            args = []  # bare --method with no value falls through to the usage message
+        else:
+            method = args[1]
+            args = args[2:]
+    if not args:
+        print(usage)
+        return
+    profiler = Profiler(method=method)
+    profiler.profile(args)  # already tokenized by the shell, no join/re-split round-trip
+    profiler.analyze_performance(format=format)
+
+
+if __name__ == "__main__":
+    main()